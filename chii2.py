@@ -4,66 +4,366 @@ from tkinter import ttk, messagebox
 import re
 import datetime
 import json
+import logging
+import math
+import queue
+import threading
+from collections import deque
+from itertools import islice
+
+try:
+    import orjson
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers
+    # can keep catching the stdlib exception.
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+logger = logging.getLogger(__name__)
+
+
+# Single-pass cleanup for reference range strings: drops thousands separators
+# and normalises the dash variants that show up in pasted ranges.
+_RANGE_TRANS = str.maketrans({',': None, '–': '-', '−': '-', '—': '-'})
+# The one multi-character separator, matched with any surrounding whitespace.
+_TO_RE = re.compile(r'\s+to\s+')
+
+# Matches "[<|>] number [- number] [unit]", e.g. "14.5-22.5 g/dL", ">95%".
+_NUMBER = r'[-+]?\d*\.?\d+(?:[eE][-+]?\d+)?'
+_RANGE_RE = re.compile(
+    rf'^\s*([<>])?\s*({_NUMBER})%?(?:\s*-\s*({_NUMBER})%?)?\s*(.*)$'
+)
+_NON_NUMBER_RE = re.compile(r'[^\d.]')
+# Separator in displayed "low - high" ranges. Requiring whitespace around the
+# dash keeps it from splitting inside a negative bound such as "-0.5 - 1.0".
+_RANGE_SEP_RE = re.compile(r'\s+[-–—]\s+')
+
+
+def _to_number(token: str) -> float:
+    """Parses a token after stripping everything but digits and dots."""
+    return float(_NON_NUMBER_RE.sub('', token))
+
+
+# Shown in place of the upper bound of an open-ended (">X") range
+OPEN_HIGH = '∞'
+
+
+def _to_low(value: str) -> float:
+    """Parses a lower bound entry, which must be a finite number."""
+    low = float(value)
+    if not math.isfinite(low):
+        raise ValueError(f"not a finite number: {value!r}")
+    return low
+
+
+def _to_high(value: str):
+    """Parses an upper bound entry; OPEN_HIGH or "inf" mean open-ended (None).
+
+    Raises ValueError for anything else that is not a number, including NaN.
+    """
+    if value == OPEN_HIGH:
+        return None
+    high = float(value)
+    if math.isnan(high):
+        raise ValueError(f"not a number: {value!r}")
+    return None if high == float('inf') else high
+
+
+# Text export record for one lab_parameters row; apply with % to the row tuple.
+_EXPORT_RECORD = (
+    "ID: %s\n"
+    "Parameter: %s\n"
+    "Category: %s\n"
+    "Age Group: %s\n"
+    "Range: %s - %s\n"
+    "Unit: %s\n"
+    "Notes: %s\n"
+    + "-" * 50 + "\n"
+)
+
+AGE_GROUPS = (
+    "Neonate",
+    "Infant",
+    "Child",
+    "Adolescent",
+    "Adult",
+    "Pregnancy"
+)
+
+UNITS = (
+    "g/dL", "mg/dL", "µg/dL",
+    "mmol/L", "µmol/L",
+    "mEq/L", "ng/mL",
+    "U/L", "IU/L",
+    "%",
+    "cells/µL",
+    "g/L",
+    "pg",
+    "ratio",
+    "seconds",
+    "K/µL",
+    "mm/hr"
+)
+
+# Search tab match modes: substring, then prefix
+SEARCH_MODES = ("Contains", "Starts with")
 
 
 class LabDatabase:
     """Handles all SQLite database interactions for lab parameters."""
 
-    def __init__(self, db_name: str = "lab_parameters.db"):
-        self.db_name = db_name
-        self.conn = sqlite3.connect(db_name)
-        self.create_tables()
-
-    def create_tables(self):
-        cursor = self.conn.cursor()
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS lab_parameters (
+    # Rows per executemany batch for bulk inserts.
+    BULK_BATCH_SIZE = 10000
+    # Names per IN-list lookup; SQLite before 3.32 allows only 999 bound
+    # parameters per statement.
+    LOOKUP_BATCH_SIZE = 500
+    # Shortest search term the trigram index can match on.
+    FTS_MIN_TERM = 3
+    # Keeps lab_fts in step with deleted rows; purge() drops it temporarily.
+    FTS_DELETE_TRIGGER = '''
+        CREATE TRIGGER IF NOT EXISTS lab_fts_delete AFTER DELETE ON lab_parameters BEGIN
+            INSERT INTO lab_fts(lab_fts, rowid, parameter_name)
+            VALUES ('delete', old.id, old.parameter_name);
+        END'''
+    # Column definitions of lab_parameters. A NULL high_range is an
+    # open-ended range (">X").
+    TABLE_COLUMNS = '''
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             parameter_name TEXT NOT NULL,
             category TEXT,
             age_group TEXT NOT NULL,
             low_range REAL NOT NULL,
-            high_range REAL NOT NULL,
+            high_range REAL CHECK(high_range IS NULL OR high_range > low_range),
             unit TEXT,
             notes TEXT,
             UNIQUE(parameter_name, age_group)
-        )
+    '''
+
+    def __init__(self, db_name: str = "lab_parameters.db"):
+        self.db_name = db_name
+        # Autocommit mode: single statements commit on their own and bulk
+        # paths open their own transactions with an explicit BEGIN.
+        self.conn = sqlite3.connect(db_name, isolation_level=None)
+        self.conn.executescript('''
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous=NORMAL;
+            PRAGMA temp_store=MEMORY;
+            PRAGMA cache_size=-20000;
+            PRAGMA mmap_size=268435456;
         ''')
+        # Display rows from the last list_all_parameters call, and the
+        # _data_version they were read at
+        self._all_rows = None
+        self._all_rows_version = None
+        self.create_tables()
+
+    def create_tables(self):
+        cursor = self.conn.cursor()
+        cursor.execute(f'CREATE TABLE IF NOT EXISTS lab_parameters ({self.TABLE_COLUMNS})')
+        self.migrate_open_high_range()
+        # NOCASE so prefix LIKE searches (case-insensitive by default) can use
+        # it; age_group is carried along so its filter is checked in the index.
+        cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_param_lower
+        ON lab_parameters(parameter_name COLLATE NOCASE, age_group)
+        ''')
+        self.create_search_index()
         self.conn.commit()
 
+    def migrate_open_high_range(self):
+        """Rebuilds a lab_parameters table created with high_range NOT NULL.
+
+        Open-ended ranges used to be stored with an infinite high_range. SQLite
+        cannot relax a column constraint in place, so the table is copied into
+        the current schema, with infinite highs turned into NULL. Row ids and
+        the AUTOINCREMENT counter are kept, so the FTS index stays valid.
+        """
+        cursor = self.conn.cursor()
+        not_null = {row[1]: row[3] for row in cursor.execute('PRAGMA table_info(lab_parameters)')}
+        if not not_null['high_range']:
+            return
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            cursor.execute(f'CREATE TABLE lab_parameters_new ({self.TABLE_COLUMNS})')
+            cursor.execute('''
+            INSERT INTO lab_parameters_new
+            SELECT id, parameter_name, category, age_group, low_range,
+                   CASE WHEN high_range >= 9e999 THEN NULL ELSE high_range END,
+                   unit, notes
+            FROM lab_parameters
+            ''')
+            cursor.execute("SELECT seq FROM sqlite_sequence WHERE name = 'lab_parameters'")
+            seq = cursor.fetchone()
+            cursor.execute('DROP TABLE lab_parameters')
+            cursor.execute('ALTER TABLE lab_parameters_new RENAME TO lab_parameters')
+            if seq is not None:
+                cursor.execute(
+                    "UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'lab_parameters'",
+                    seq
+                )
+            cursor.execute('COMMIT')
+        except sqlite3.Error:
+            cursor.execute('ROLLBACK')
+            raise
+
+    def create_search_index(self):
+        """Creates the FTS5 trigram index used for "contains" searches.
+
+        The trigram tokenizer lets FTS5 answer LIKE '%...%' with an index lookup
+        instead of scanning lab_parameters. Builds of SQLite without FTS5 fall
+        back to plain LIKE scans.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = 'lab_fts'")
+        exists = cursor.fetchone() is not None
+        try:
+            cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS lab_fts USING fts5(
+                parameter_name,
+                content='lab_parameters',
+                content_rowid='id',
+                tokenize='trigram'
+            )
+            ''')
+        except sqlite3.OperationalError:
+            self.has_fts = False
+            return
+        self.has_fts = True
+        cursor.executescript(f'''
+        CREATE TRIGGER IF NOT EXISTS lab_fts_insert AFTER INSERT ON lab_parameters BEGIN
+            INSERT INTO lab_fts(rowid, parameter_name) VALUES (new.id, new.parameter_name);
+        END;
+        {self.FTS_DELETE_TRIGGER};
+        CREATE TRIGGER IF NOT EXISTS lab_fts_update AFTER UPDATE OF parameter_name ON lab_parameters BEGIN
+            INSERT INTO lab_fts(lab_fts, rowid, parameter_name)
+            VALUES ('delete', old.id, old.parameter_name);
+            INSERT INTO lab_fts(rowid, parameter_name) VALUES (new.id, new.parameter_name);
+        END;
+        ''')
+        if not exists:
+            # Index rows written before the FTS table existed
+            cursor.execute("INSERT INTO lab_fts(lab_fts) VALUES ('rebuild')")
+
     def add_parameter(self, parameter_name: str, category: str, age_group: str, 
                       low_range: float, high_range: float, 
                       unit: str = None, notes: str = None) -> bool:
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            INSERT INTO lab_parameters 
+            (parameter_name, category, age_group, low_range, high_range, unit, notes)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(parameter_name, age_group) DO NOTHING
+        ''', (parameter_name, category, age_group, low_range, high_range, unit, notes))
+        self.conn.commit()
+        # A skipped (already existing) row changes nothing
+        return cursor.rowcount == 1
+
+    def add_parameters(self, rows: list) -> list:
+        """Inserts many parameters in a single transaction.
+
+        Each row is (parameter_name, category, age_group, low_range, high_range, unit, notes).
+        Returns one bool per row: True if it was inserted, False if the
+        parameter already existed for that age group. Any other database
+        error rolls the whole batch back and is re-raised.
+        """
+        if not rows:
+            return []
+        batch_size = self.BULK_BATCH_SIZE
+        cursor = self.conn.cursor()
         try:
-            cursor = self.conn.cursor()
-            cursor.execute('''
-                INSERT INTO lab_parameters 
-                (parameter_name, category, age_group, low_range, high_range, unit, notes)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (parameter_name, category, age_group, low_range, high_range, unit, notes))
-            self.conn.commit()
-            return True
-        except sqlite3.IntegrityError:
-            return False
+            # IMMEDIATE takes the write lock up front so no other connection can
+            # add rows between the duplicate lookup and the insert.
+            self.conn.execute("BEGIN IMMEDIATE")
+            # Look up the (name, age group) pairs that are already taken so each
+            # row can be reported individually after the batched insert.
+            existing = set()
+            names = list({row[0] for row in rows})
+            lookup_size = self.LOOKUP_BATCH_SIZE
+            for start in range(0, len(names), lookup_size):
+                chunk = names[start:start + lookup_size]
+                cursor.execute(f'''
+                SELECT parameter_name, age_group FROM lab_parameters
+                WHERE parameter_name IN ({", ".join("?" * len(chunk))})
+                ''', chunk)
+                existing.update(cursor.fetchall())
 
-    def get_parameter(self, parameter_name: str, age_group: str = None) -> list:
+            results = []
+            for row in rows:
+                key = (row[0], row[2])
+                results.append(key not in existing)
+                existing.add(key)
+
+            for start in range(0, len(rows), batch_size):
+                cursor.executemany('''
+                    INSERT INTO lab_parameters
+                    (parameter_name, category, age_group, low_range, high_range, unit, notes)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(parameter_name, age_group) DO NOTHING
+                ''', rows[start:start + batch_size])
+            self.conn.commit()
+            return results
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+
+    def get_parameter(self, parameter_name: str, age_group: str = None,
+                      prefix: bool = False) -> list:
+        """Returns display rows: (name, category, age group, "low - high", unit, notes).
+
+        Open-ended ranges are displayed with OPEN_HIGH as the upper bound.
+        """
+        # A prefix pattern can be served from idx_param_lower; a contains
+        # pattern goes through the trigram index when it has enough characters.
+        pattern = f'{parameter_name}%' if prefix else f'%{parameter_name}%'
+        age_group = age_group or None
         cursor = self.conn.cursor()
-        if age_group:
+        # The cheap age group equality is evaluated before the LIKE
+        if not prefix and self.has_fts and len(parameter_name) >= self.FTS_MIN_TERM:
+            # CROSS JOIN pins lab_fts as the outer loop; once PRAGMA optimize
+            # has written statistics the planner would otherwise scan
+            # lab_parameters and run one trigram query per row.
             cursor.execute('''
-            SELECT * FROM lab_parameters 
-            WHERE parameter_name LIKE ? AND age_group = ?
-            ''', (f'%{parameter_name}%', age_group))
+            SELECT p.parameter_name, COALESCE(p.category, ''), p.age_group,
+                   p.low_range || ' - ' || COALESCE(p.high_range, ?), COALESCE(p.unit, ''), COALESCE(p.notes, '')
+            FROM lab_fts CROSS JOIN lab_parameters AS p ON p.id = lab_fts.rowid
+            WHERE (? IS NULL OR p.age_group = ?)
+              AND lab_fts.parameter_name LIKE ?
+            ''', (OPEN_HIGH, age_group, age_group, pattern))
         else:
             cursor.execute('''
-            SELECT * FROM lab_parameters 
-            WHERE parameter_name LIKE ?
-            ''', (f'%{parameter_name}%',))
+            SELECT parameter_name, COALESCE(category, ''), age_group,
+                   low_range || ' - ' || COALESCE(high_range, ?), COALESCE(unit, ''), COALESCE(notes, '')
+            FROM lab_parameters
+            WHERE (? IS NULL OR age_group = ?) AND parameter_name LIKE ?
+            ''', (OPEN_HIGH, age_group, age_group, pattern))
         return cursor.fetchall()
 
+    def _data_version(self) -> tuple:
+        """Returns a token that changes whenever the database has been modified.
+
+        data_version moves when another connection commits; total_changes
+        covers writes made through this one.
+        """
+        return self.conn.execute('PRAGMA data_version').fetchone()[0], self.conn.total_changes
+
     def list_all_parameters(self) -> list:
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM lab_parameters')
-        return cursor.fetchall()
+        """Returns every parameter in the same display row shape as get_parameter.
+
+        The rows are cached and only re-read once the database has changed,
+        so refreshing an unchanged view costs no table scan. Callers must not
+        modify the returned list.
+        """
+        version = self._data_version()
+        if self._all_rows is None or version != self._all_rows_version:
+            cursor = self.conn.cursor()
+            cursor.execute('''
+            SELECT parameter_name, COALESCE(category, ''), age_group,
+                   low_range || ' - ' || COALESCE(high_range, ?), COALESCE(unit, ''), COALESCE(notes, '')
+            FROM lab_parameters
+            ''', (OPEN_HIGH,))
+            self._all_rows = cursor.fetchall()
+            self._all_rows_version = version
+        return self._all_rows
 
     def update_parameter(self, old_param_name: str, old_age_group: str,
                          new_param_name: str, new_category: str, new_age_group: str,
@@ -71,21 +371,14 @@ class LabDatabase:
                          unit: str = None, notes: str = None) -> bool:
         try:
             cursor = self.conn.cursor()
-            # Check uniqueness if changing param name or age group
-            if (old_param_name != new_param_name or old_age_group != new_age_group):
-                cursor.execute('''
-                SELECT COUNT(*) FROM lab_parameters 
-                WHERE parameter_name=? AND age_group=? 
-                  AND (parameter_name!=? OR age_group!=?)
-                ''', (new_param_name, new_age_group, old_param_name, old_age_group))
-                if cursor.fetchone()[0] > 0:
-                    return False
-
+            # A new name/age group taken by another row violates the UNIQUE
+            # constraint; the failed statement is rolled back on its own.
             cursor.execute('''
-            UPDATE lab_parameters 
+            UPDATE lab_parameters
             SET parameter_name=?, category=?, age_group=?, low_range=?, high_range=?, unit=?, notes=?
             WHERE parameter_name=? AND age_group=?
-            ''', (new_param_name, new_category, new_age_group, low_range, high_range, unit, notes, old_param_name, old_age_group))
+            ''', (new_param_name, new_category, new_age_group, low_range, high_range, unit, notes,
+                  old_param_name, old_age_group))
             self.conn.commit()
             return cursor.rowcount > 0
         except sqlite3.Error:
@@ -101,8 +394,64 @@ class LabDatabase:
         except sqlite3.Error:
             return False
 
+    def export_rows(self) -> sqlite3.Cursor:
+        """Returns a cursor over every row in _EXPORT_RECORD field order.
+
+        Open-ended ranges have OPEN_HIGH as their high_range.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('''
+        SELECT id, parameter_name, category, age_group, low_range,
+               COALESCE(high_range, ?), unit, notes
+        FROM lab_parameters
+        ''', (OPEN_HIGH,))
+        return cursor
+
+    def backup(self, filename: str):
+        """Copies the whole database into a new SQLite file at filename."""
+        target = sqlite3.connect(filename)
+        try:
+            self.conn.backup(target)
+        finally:
+            target.close()
+
+    def purge(self):
+        """Deletes every parameter in a single transaction.
+
+        SQLite only empties a table wholesale, rather than row by row, when no
+        DELETE trigger is attached, so the FTS delete trigger is dropped for
+        the duration and the index is cleared with one 'delete-all' instead.
+        """
+        cursor = self.conn.cursor()
+        try:
+            self.conn.execute("BEGIN IMMEDIATE")
+            if self.has_fts:
+                cursor.execute('DROP TRIGGER IF EXISTS lab_fts_delete')
+            cursor.execute('DELETE FROM lab_parameters')
+            if self.has_fts:
+                cursor.execute("INSERT INTO lab_fts(lab_fts) VALUES ('delete-all')")
+                cursor.execute(self.FTS_DELETE_TRIGGER)
+            self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+
     def close(self):
-        self.conn.close()
+        # Safe to call twice, or on an instance whose __init__ failed early
+        if getattr(self, 'conn', None) is not None:
+            try:
+                # Refresh any planner statistics this session's queries found stale
+                self.conn.execute("PRAGMA optimize")
+            except sqlite3.Error:
+                pass
+            self.conn.close()
+            self.conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def __del__(self):
         self.close()
@@ -119,9 +468,7 @@ class EditParameterDialog(tk.Toplevel):
 
         # values = (Parameter, Category, Age Group, Range, Unit, Notes)
         param_name, category, age_group, param_range, unit, notes = values
-        low_val, high_val = param_range.split("-")
-        low_val = low_val.strip()
-        high_val = high_val.strip()
+        low_val, high_val = _RANGE_SEP_RE.split(param_range, 1)
 
         tk.Label(self, text="Parameter Name:").grid(row=0, column=0, padx=5, pady=5, sticky="e")
         self.param_name_entry = ttk.Entry(self)
@@ -185,12 +532,12 @@ class EditParameterDialog(tk.Toplevel):
             messagebox.showerror("Error", "Age Group cannot be empty.", parent=self)
             return
         try:
-            low = float(low_val)
-            high = float(high_val)
+            low = _to_low(low_val)
+            high = _to_high(high_val)
         except ValueError:
             messagebox.showerror("Error", "Please enter valid numbers for ranges!", parent=self)
             return
-        if low >= high:
+        if high is not None and low >= high:
             messagebox.showerror("Error", "Lower range must be less than higher range.", parent=self)
             return
 
@@ -205,29 +552,10 @@ class EditParameterDialog(tk.Toplevel):
 class LabParametersGUI:
     """Main application GUI for managing lab parameters."""
 
-    AGE_GROUPS = [
-        "Neonate",
-        "Infant",
-        "Child",
-        "Adolescent",
-        "Adult",
-        "Pregnancy"
-    ]
-
-    UNITS = [
-        "g/dL", "mg/dL", "µg/dL",
-        "mmol/L", "µmol/L",
-        "mEq/L", "ng/mL",
-        "U/L", "IU/L",
-        "%",
-        "cells/µL",
-        "g/L",
-        "pg",
-        "ratio",
-        "seconds",
-        "K/µL",
-        "mm/hr"
-    ]
+    # How often the mainloop checks for a finished background task
+    POLL_INTERVAL_MS = 50
+    # Rows fetched and written per batch when exporting
+    EXPORT_BATCH_SIZE = 4096
 
     def __init__(self, root):
         self.root = root
@@ -252,10 +580,28 @@ class LabParametersGUI:
         self.notebook.add(self.view_tab, text="View All")
         self.notebook.add(self.parse_tab, text="Parse Text Input")
 
-        self.setup_add_tab()
-        self.setup_search_tab()
-        self.setup_view_tab()
-        self.setup_parse_tab()
+        # Trees are created with their tabs; None until a tab is first shown
+        self.search_tree = self.view_tree = self.parsed_tree = None
+        # Typed (name, age group, low, high, unit, notes) per parsed_tree item
+        self._parsed_rows = {}
+
+        # Each tab's widgets are built the first time it is selected
+        self._tab_setup = {
+            str(self.add_tab): self.setup_add_tab,
+            str(self.search_tab): self.setup_search_tab,
+            str(self.view_tab): self.setup_view_tab,
+            str(self.parse_tab): self.setup_parse_tab,
+        }
+        self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+        self._on_tab_changed()
+
+    def _on_tab_changed(self, event=None):
+        tab = str(self.notebook.select())
+        setup = self._tab_setup.pop(tab, None)
+        if setup is not None:
+            setup()
+            if tab == str(self.view_tab):
+                self.refresh_view()
 
     def setup_add_tab(self):
         for i in range(7):
@@ -270,7 +616,7 @@ class LabParametersGUI:
         self.category.grid(row=1, column=1, padx=5, pady=5, sticky="ew")
 
         ttk.Label(self.add_tab, text="Age Group:").grid(row=2, column=0, padx=5, pady=5, sticky="e")
-        self.age_group = ttk.Combobox(self.add_tab, values=self.AGE_GROUPS, state="readonly")
+        self.age_group = ttk.Combobox(self.add_tab, values=AGE_GROUPS, state="readonly")
         self.age_group.grid(row=2, column=1, padx=5, pady=5, sticky="ew")
 
         ttk.Label(self.add_tab, text="Lower Range:").grid(row=3, column=0, padx=5, pady=5, sticky="e")
@@ -282,7 +628,7 @@ class LabParametersGUI:
         self.high_range.grid(row=4, column=1, padx=5, pady=5, sticky="ew")
 
         ttk.Label(self.add_tab, text="Unit:").grid(row=5, column=0, padx=5, pady=5, sticky="e")
-        self.unit = ttk.Combobox(self.add_tab, values=self.UNITS, state="readonly")
+        self.unit = ttk.Combobox(self.add_tab, values=UNITS, state="readonly")
         self.unit.grid(row=5, column=1, padx=5, pady=5, sticky="ew")
 
         ttk.Label(self.add_tab, text="Notes:").grid(row=6, column=0, padx=5, pady=5, sticky="e")
@@ -302,9 +648,14 @@ class LabParametersGUI:
         self.search_name.grid(row=0, column=1, padx=5, pady=5)
 
         ttk.Label(search_frame, text="Age Group (optional):").grid(row=1, column=0, padx=5, pady=5)
-        self.search_age = ttk.Combobox(search_frame, values=[""] + self.AGE_GROUPS, state="readonly")
+        self.search_age = ttk.Combobox(search_frame, values=("",) + AGE_GROUPS, state="readonly")
         self.search_age.grid(row=1, column=1, padx=5, pady=5)
 
+        ttk.Label(search_frame, text="Match:").grid(row=2, column=0, padx=5, pady=5)
+        self.search_mode = ttk.Combobox(search_frame, values=SEARCH_MODES, state="readonly")
+        self.search_mode.set(SEARCH_MODES[0])
+        self.search_mode.grid(row=2, column=1, padx=5, pady=5)
+
         button_frame = ttk.Frame(self.search_tab)
         button_frame.grid(row=1, column=0, pady=5)
 
@@ -334,7 +685,8 @@ class LabParametersGUI:
 
         style = ttk.Style()
         style.configure("Danger.TButton", foreground="red")
-        ttk.Button(button_frame, text="Purge Database", command=self.purge_database, style="Danger.TButton").grid(row=0, column=4, padx=5)
+        self.purge_button = ttk.Button(button_frame, text="Purge Database", command=self.purge_database, style="Danger.TButton")
+        self.purge_button.grid(row=0, column=4, padx=5)
 
         self.view_tree = ttk.Treeview(self.view_tab, columns=("Parameter", "Category", "Age Group", "Range", "Unit", "Notes"), show="headings")
         self.setup_treeview(self.view_tree)
@@ -344,8 +696,6 @@ class LabParametersGUI:
         scrollbar.grid(row=1, column=1, sticky="ns")
         self.view_tree.configure(yscrollcommand=scrollbar.set)
 
-        self.refresh_view()
-
     def setup_parse_tab(self):
         self.parse_tab.grid_rowconfigure(1, weight=1)
         self.parse_tab.grid_columnconfigure(0, weight=1)
@@ -360,7 +710,8 @@ class LabParametersGUI:
 
         btn_frame = ttk.Frame(parse_frame)
         btn_frame.grid(row=2, column=0, sticky="ew", pady=5)
-        ttk.Button(btn_frame, text="Parse", command=self.parse_text_input).grid(row=0, column=0, padx=5)
+        self.parse_button = ttk.Button(btn_frame, text="Parse", command=self.parse_text_input)
+        self.parse_button.grid(row=0, column=0, padx=5)
         ttk.Button(btn_frame, text="Clear All", command=lambda: self.raw_text.delete("1.0", tk.END)).grid(row=0, column=1, padx=5)
 
         # The parsed_tree will show parsed results
@@ -372,13 +723,15 @@ class LabParametersGUI:
         parse_confirm_frame.grid(row=2, column=0, sticky="ew", pady=5)
 
         ttk.Button(parse_confirm_frame, text="Select All", command=lambda: self.select_all_items(self.parsed_tree)).grid(row=0, column=0, padx=5)
-        ttk.Button(parse_confirm_frame, text="Confirm Selected", command=self.confirm_parsed_selected).grid(row=0, column=1, padx=5)
+        self.confirm_button = ttk.Button(parse_confirm_frame, text="Confirm Selected", command=self.confirm_parsed_selected)
+        self.confirm_button.grid(row=0, column=1, padx=5)
 
     def setup_treeview(self, tree):
-        columns = tree["columns"]
-        for col in columns:
-            tree.heading(col, text=col)
-            tree.column(col, width=100)
+        # Straight to the Tcl commands, as in populate_tree
+        call, widget = tree.tk.call, tree._w
+        for col in tree["columns"]:
+            call(widget, "heading", col, "-text", col)
+            call(widget, "column", col, "-width", 100)
 
     def add_parameter(self):
         param_name = self.param_name.get().strip()
@@ -395,13 +748,13 @@ class LabParametersGUI:
             return
 
         try:
-            low = float(low_val)
-            high = float(high_val)
+            low = _to_low(low_val)
+            high = _to_high(high_val)
         except ValueError:
             messagebox.showerror("Error", "Please enter valid numbers for ranges!")
             return
 
-        if low >= high:
+        if high is not None and low >= high:
             messagebox.showerror("Error", "Lower range must be less than higher range.")
             return
 
@@ -425,41 +778,45 @@ class LabParametersGUI:
             messagebox.showerror("Error", "Parameter for this age group already exists!")
 
     def search_parameters(self):
-        for item in self.search_tree.get_children():
-            self.search_tree.delete(item)
-
         param_name = self.search_name.get().strip()
         age_grp = self.search_age.get().strip() if self.search_age.get().strip() else None
 
         if not param_name:
+            self.populate_tree(self.search_tree, ())
             messagebox.showerror("Error", "Please enter a parameter name to search.")
             return
 
-        results = self.db.get_parameter(param_name, age_grp)
-        for result in results:
-            self.search_tree.insert("", "end", values=(
-                result[1],  
-                result[2] if result[2] else "", 
-                result[3],  
-                f"{result[4]} - {result[5]}",  
-                result[6] if result[6] else "", 
-                result[7] if result[7] else ""
-            ))
+        prefix = self.search_mode.get() == SEARCH_MODES[1]
+        self.populate_tree(self.search_tree, self.db.get_parameter(param_name, age_grp, prefix))
 
     def refresh_view(self):
-        for item in self.view_tree.get_children():
-            self.view_tree.delete(item)
-
-        results = self.db.list_all_parameters()
-        for result in results:
-            self.view_tree.insert("", "end", values=(
-                result[1],
-                result[2] if result[2] else "",
-                result[3],
-                f"{result[4]} - {result[5]}",
-                result[6] if result[6] else "",
-                result[7] if result[7] else ""
-            ))
+        self.populate_tree(self.view_tree, self.db.list_all_parameters())
+
+    def populate_tree(self, tree, rows, batch_size=500):
+        """Replaces the contents of a Treeview with the given value tuples.
+
+        Rows are inserted in batches, with pending redraws flushed between
+        batches, so the window keeps painting during long fills. Returns the
+        ids of the inserted items, in order.
+        """
+        children = tree.get_children()
+        if children:
+            tree.delete(*children)
+        # Detach the scrollbar while filling so it isn't updated once per row
+        yscrollcommand = tree.cget("yscrollcommand")
+        tree.configure(yscrollcommand="")
+        iids = []
+        # Call the Tcl insert command directly: Treeview.insert re-formats its
+        # options and stringifies each values tuple on every call, while
+        # tk.call hands the tuple to Tcl as a list as-is.
+        call, widget = tree.tk.call, tree._w
+        rows = iter(rows)
+        for batch in iter(lambda: list(islice(rows, batch_size)), []):
+            for values in batch:
+                iids.append(call(widget, "insert", "", "end", "-values", values))
+            tree.update_idletasks()
+        tree.configure(yscrollcommand=yscrollcommand)
+        return iids
 
     def edit_selected(self, tree):
         selected_items = tree.selection()
@@ -470,7 +827,7 @@ class LabParametersGUI:
         selected_item = selected_items[0]
         values = tree.item(selected_item)['values']
         if values:
-            dialog = EditParameterDialog(self, values, self.AGE_GROUPS, self.UNITS)
+            dialog = EditParameterDialog(self, values, AGE_GROUPS, UNITS)
             self.root.wait_window(dialog)
             if dialog.result:
                 old_param_name = values[0]
@@ -478,7 +835,7 @@ class LabParametersGUI:
                 param_name, category, age_group, range_min, range_max, unit, notes = dialog.result
                 updated = self.db.update_parameter(old_param_name, old_age_group, param_name, category, age_group, range_min, range_max, unit, notes)
                 if updated:
-                    tree.item(selected_item, values=(param_name, category if category else "", age_group, f"{range_min} - {range_max}", unit if unit else "", notes if notes else ""))
+                    tree.item(selected_item, values=(param_name, category if category else "", age_group, f"{range_min} - {OPEN_HIGH if range_max is None else range_max}", unit if unit else "", notes if notes else ""))
                     messagebox.showinfo("Success", "Parameter updated successfully!")
                     if tree == self.search_tree:
                         self.search_parameters()
@@ -510,32 +867,46 @@ class LabParametersGUI:
                     messagebox.showerror("Error", "Failed to remove parameter!")
 
     def parse_text_input(self):
-        for item in self.parsed_tree.get_children():
-            self.parsed_tree.delete(item)
+        self.populate_tree(self.parsed_tree, ())
+        self._parsed_rows = {}
 
         raw_data = self.raw_text.get("1.0", tk.END).strip()
         if not raw_data:
             messagebox.showerror("Error", "No JSON data provided for parsing.")
             return
 
+        # Decode and walk the JSON on a worker thread so large pastes don't
+        # freeze the window; the tree is filled back on the Tk thread.
+        self.parse_button.state(["disabled"])
+        self.run_in_background(
+            lambda: self.parse_nicu_reference_ranges(raw_data),
+            self.show_parsed_entries
+        )
+
+    def show_parsed_entries(self, parsed_entries, error=None):
+        self.parse_button.state(["!disabled"])
         try:
-            parsed_entries = self.parse_nicu_reference_ranges(raw_data)
+            if error is not None:
+                raise error
 
             if not parsed_entries:
                 messagebox.showwarning("No Matches", "No parameter entries found. Please check your input JSON.")
                 return
 
-            for entry in parsed_entries:
-                param_name, category, age_group, low, high, unit, _ = entry
-                range_str = f"{low} - {high}"
-                notes = f"Category: {category}" if category else ""
-                self.parsed_tree.insert("", "end", values=(
-                    param_name,
-                    age_group,
-                    range_str,
-                    unit if unit else "",
-                    notes
-                ))
+            iids = self.populate_tree(self.parsed_tree, [(
+                param_name,
+                age_group,
+                f"{low} - {OPEN_HIGH if high is None else high}",
+                unit if unit else "",
+                f"Category: {category}" if category else ""
+            ) for param_name, category, age_group, low, high, unit, _ in parsed_entries])
+            # Keep the typed values per item so confirming doesn't have to read
+            # them back from Tk and re-parse the displayed range.
+            self._parsed_rows = {
+                iid: (param_name, age_group, low, high, unit, f"Category: {category}" if category else "")
+                for iid, (param_name, category, age_group, low, high, unit, _)
+                in zip(iids, parsed_entries)
+            }
 
         except json.JSONDecodeError as e:
             messagebox.showerror("JSON Error", f"Invalid JSON format: {str(e)}")
@@ -548,31 +919,17 @@ class LabParametersGUI:
             messagebox.showwarning("Warning", "Please select parameters to confirm")
             return
 
-        success_messages = []
         error_messages = []
+        rows = []
 
         for sel in selected_items:
-            values = self.parsed_tree.item(sel)['values']
-            # values: (param_name, age, range, unit, notes)
-            param_name = values[0]
-            age = values[1]
-            rng = values[2]
-            unit = values[3]
-            notes = values[4]
-
-            try:
-                low_val, high_val = [v.strip() for v in rng.split("-")]
-                low = float(low_val)
-                high = float(high_val)
-            except ValueError:
-                error_messages.append(f"Invalid numeric range for {param_name}")
-                continue
+            param_name, age, low, high, unit, notes = self._parsed_rows[sel]
 
-            if low >= high:
+            if high is not None and low >= high:
                 error_messages.append(f"Lower range must be less than higher range for {param_name}")
                 continue
 
-            success = self.db.add_parameter(
+            rows.append((
                 param_name,
                 None,
                 age,
@@ -580,12 +937,37 @@ class LabParametersGUI:
                 high,
                 unit if unit else None,
                 notes if notes else None
-            )
+            ))
+
+        if not rows:
+            self.show_import_summary(rows, [], error_messages)
+            return
+
+        # Insert on a worker thread with its own connection; WAL lets this
+        # connection keep reading while the import writes.
+        self.confirm_button.state(["disabled"])
+        self.run_in_background(
+            lambda: self.import_parameters(rows),
+            lambda results, error: self.show_import_summary(rows, results, error_messages, error)
+        )
+
+    def import_parameters(self, rows):
+        """Bulk-inserts rows through a dedicated connection (runs off the Tk thread)."""
+        with LabDatabase(self.db.db_name) as db:
+            return db.add_parameters(rows)
+
+    def show_import_summary(self, rows, results, error_messages, error=None):
+        self.confirm_button.state(["!disabled"])
+        if error is not None:
+            messagebox.showerror("Error", f"Failed to import parameters: {str(error)}")
+            return
 
+        success_messages = []
+        for row, success in zip(rows, results):
             if success:
-                success_messages.append(f"Parameter '{param_name}' added successfully!")
+                success_messages.append(f"Parameter '{row[0]}' added successfully!")
             else:
-                error_messages.append(f"Parameter '{param_name}' for age group '{age}' already exists!")
+                error_messages.append(f"Parameter '{row[0]}' for age group '{row[2]}' already exists!")
 
         summary = ""
         if success_messages:
@@ -596,42 +978,87 @@ class LabParametersGUI:
         if summary:
             messagebox.showinfo("Import Summary", summary)
 
+    def run_in_background(self, work, on_done):
+        """Runs work() on a worker thread and hands the outcome to the Tk thread.
+
+        on_done is called from the mainloop as on_done(result, error), where
+        error is the exception raised by work() or None.
+        """
+        outcome = queue.Queue(maxsize=1)
+
+        def target():
+            try:
+                outcome.put((work(), None))
+            except Exception as e:
+                outcome.put((None, e))
+
+        def poll():
+            try:
+                result, error = outcome.get_nowait()
+            except queue.Empty:
+                self.root.after(self.POLL_INTERVAL_MS, poll)
+                return
+            on_done(result, error)
+
+        threading.Thread(target=target, daemon=True).start()
+        self.root.after(self.POLL_INTERVAL_MS, poll)
+
     def parse_nicu_reference_ranges(self, json_data):
         """Parses NICU reference ranges from JSON input."""
         try:
             # Parse JSON string if it's a string, otherwise use the data directly
             if isinstance(json_data, str):
-                data = json.loads(json_data)
+                data = _json_loads(json_data)
             else:
                 data = json_data
 
-            print("Successfully parsed JSON")  # Debug print
+            logger.debug("Successfully parsed JSON")
             results = []
-            
+            # Bound once; process_test appends for every parsed range
+            results_append = results.append
+
             def extract_range_and_unit(range_str):
                 """Extract numeric range and unit from a range string."""
-                print(f"Processing range string: {range_str}")  # Debug print
-                
-                # Remove commas from numbers
-                range_str = range_str.replace(',', '')
-                
+
+                # JSON numbers (e.g. "ReferenceRange": 5) arrive as int/float
+                if not isinstance(range_str, str):
+                    range_str = str(range_str)
+
+                # Remove commas from numbers, normalise dashes and 'to'
+                range_str = _TO_RE.sub('-', range_str.translate(_RANGE_TRANS))
+
+                # Qualifier, bounds and unit in a single regex match
+                match = _RANGE_RE.match(range_str)
+                if match is None:
+                    try:
+                        return extract_range_and_unit_fallback(range_str)
+                    except (ValueError, IndexError):
+                        return None, None, ''
+                qualifier, low, high, unit = match.groups()
+                unit = unit.strip() or ('%' if '%' in range_str else '')
+                if qualifier == '>':
+                    low, high = float(low), None
+                elif qualifier == '<':
+                    low, high = 0, float(low)
+                else:
+                    low = float(low)
+                    high = float(high) if high is not None else low
+                return low, high, unit
+
+            def extract_range_and_unit_fallback(range_str):
+                """Token-based extraction for strings _RANGE_RE does not match."""
                 # Handle special cases
                 if '>' in range_str:
                     parts = range_str.replace('>', '').strip().split()
-                    num = float(''.join(filter(lambda x: x.isdigit() or x == '.', parts[0])))
+                    num = _to_number(parts[0])
                     unit = ' '.join(parts[1:]) if len(parts) > 1 else '%' if '%' in parts[0] else ''
-                    print(f"Extracted '>' range: {num} to inf, unit: {unit}")  # Debug print
-                    return num, float('inf'), unit
+                    return num, None, unit
                 elif '<' in range_str:
                     parts = range_str.replace('<', '').strip().split()
-                    num = float(''.join(filter(lambda x: x.isdigit() or x == '.', parts[0])))
+                    num = _to_number(parts[0])
                     unit = ' '.join(parts[1:]) if len(parts) > 1 else '%' if '%' in parts[0] else ''
-                    print(f"Extracted '<' range: 0 to {num}, unit: {unit}")  # Debug print
                     return 0, num, unit
                 
-                # Handle ranges with '-' or 'to'
-                range_str = range_str.replace('–', '-').replace(' to ', '-')
-                
                 # Split into numeric part and unit part
                 parts = range_str.split()
                 numeric_part = parts[0]
@@ -646,93 +1073,91 @@ class LabParametersGUI:
                 range_nums = numeric_part.split('-')
                 try:
                     if len(range_nums) == 2:
-                        low = float(''.join(filter(lambda x: x.isdigit() or x == '.', range_nums[0])))
-                        high = float(''.join(filter(lambda x: x.isdigit() or x == '.', range_nums[1])))
-                        print(f"Extracted range: {low} to {high}, unit: {unit_part}")  # Debug print
+                        low = _to_number(range_nums[0])
+                        high = _to_number(range_nums[1])
                         return low, high, unit_part if unit_part else '%' if '%' in range_str else ''
                     else:
-                        num = float(''.join(filter(lambda x: x.isdigit() or x == '.', range_nums[0])))
-                        print(f"Extracted single value: {num}, unit: {unit_part}")  # Debug print
+                        num = _to_number(range_nums[0])
                         return num, num, unit_part if unit_part else '%' if '%' in range_str else ''
-                except ValueError as e:
-                    print(f"Error extracting numbers: {e}")  # Debug print
+                except ValueError:
                     return None, None, ''
 
             def process_test(test_data, category):
                 """Process a single test entry."""
-                print(f"\nProcessing test: {test_data['Test']} in category: {category}")  # Debug print
-                test_name = test_data['Test']
-                ref_range = test_data['ReferenceRange']
-                
+                test_name = test_data.get('Test')
+                ref_range = test_data.get('ReferenceRange')
+                if test_name is None or ref_range is None:
+                    return
+                logger.debug("Processing test: %s in category: %s", test_name, category)
+
                 if isinstance(ref_range, dict):
-                    print(f"Found multiple ranges for different age groups")  # Debug print
+                    logger.debug("Found multiple ranges for different age groups")
                     # Handle different ranges for Term/Preterm
                     for age_group, range_str in ref_range.items():
-                        print(f"Processing age group: {age_group}")  # Debug print
+                        logger.debug("Processing age group: %s", age_group)
                         low, high, unit = extract_range_and_unit(range_str)
-                        if low is not None and high is not None:
-                            results.append((test_name, category, age_group, low, high, unit, ''))
-                            print(f"Added result for {age_group}")  # Debug print
+                        if low is not None:
+                            results_append((test_name, category, age_group, low, high, unit, ''))
+                            logger.debug("Added result for %s", age_group)
                 else:
-                    print("Processing single range")  # Debug print
+                    logger.debug("Processing single range")
                     # Single range for all age groups
                     low, high, unit = extract_range_and_unit(ref_range)
-                    if low is not None and high is not None:
-                        results.append((test_name, category, 'Neonate', low, high, unit, ''))
-                        print("Added result for Neonate")  # Debug print
-
-            # Process main categories
-            for category, tests in data['NICU_Tests'].items():
-                print(f"\nProcessing category: {category}")  # Debug print
-                if category != 'AdvancedTests':
+                    if low is not None:
+                        results_append((test_name, category, 'Neonate', low, high, unit, ''))
+                        logger.debug("Added result for Neonate")
+
+            # Walk categories depth-first with an explicit stack. A dict value
+            # holds subcategories (e.g. AdvancedTests), a list holds tests.
+            work = deque(data['NICU_Tests'].items())
+            while work:
+                category, tests = work.popleft()
+                logger.debug("Processing category: %s", category)
+                if isinstance(tests, dict):
+                    work.extendleft(reversed([
+                        (f"{category}/{subcategory}", subtests)
+                        for subcategory, subtests in tests.items()
+                    ]))
+                else:
                     for test in tests:
                         process_test(test, category)
-                else:
-                    # Handle advanced tests subcategories
-                    for subcategory, subtests in tests.items():
-                        print(f"Processing subcategory: {subcategory}")  # Debug print
-                        for test in subtests:
-                            process_test(test, f"{category}/{subcategory}")
 
-            print(f"\nTotal results found: {len(results)}")  # Debug print
+            logger.debug("Total results found: %d", len(results))
             return results
 
         except json.JSONDecodeError as e:
-            print(f"Error parsing JSON: {e}")
+            logger.error("Error parsing JSON: %s", e)
             return []
         except Exception as e:
-            print(f"Error processing data: {e}")
+            logger.error("Error processing data: %s", e)
             return []
 
     def select_all_items(self, tree):
-        tree.selection_remove(tree.selection())
-        for item in tree.get_children():
-            tree.selection_add(item)
+        # One replace of the whole selection: a single Tk command and
+        # <<TreeviewSelect>> event instead of one per item
+        tree.selection_set(tree.get_children())
 
     def export_database(self):
         try:
-            cursor = self.db.conn.cursor()
-            cursor.execute('SELECT * FROM lab_parameters')
-            rows = cursor.fetchall()
-
-            output = "Database Content:\n\n"
-            for row in rows:
-                output += (
-                    f"ID: {row[0]}\n"
-                    f"Parameter: {row[1]}\n"
-                    f"Category: {row[2]}\n"
-                    f"Age Group: {row[3]}\n"
-                    f"Range: {row[4]} - {row[5]}\n"
-                    f"Unit: {row[6]}\n"
-                    f"Notes: {row[7]}\n"
-                    + "-" * 50 + "\n"
-                )
+            cursor = self.db.export_rows()
+            fetchmany = cursor.fetchmany
+            batch = fetchmany(self.EXPORT_BATCH_SIZE)
+            # Don't create a file for an empty table
+            if not batch:
+                messagebox.showinfo("Export", "The database is empty; nothing was exported.")
+                return
 
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"database_export_{timestamp}.txt"
 
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(output)
+            # Stream rows from the cursor into a buffered file, one joined
+            # batch of records per write
+            with open(filename, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                write = f.write
+                write("Database Content:\n\n")
+                while batch:
+                    write(''.join([_EXPORT_RECORD % row for row in batch]))
+                    batch = fetchmany(self.EXPORT_BATCH_SIZE)
 
             messagebox.showinfo("Success", f"Database exported successfully to {filename}")
 
@@ -744,21 +1169,42 @@ class LabParametersGUI:
                                "Are you sure you want to purge the entire database?\n\n"
                                "This action cannot be undone!",
                                icon='warning'):
-            try:
-                self.export_database()
-                cursor = self.db.conn.cursor()
-                cursor.execute('DELETE FROM lab_parameters')
-                self.db.conn.commit()
-                self.refresh_view()
-                messagebox.showinfo("Success", "Database has been purged successfully.\nA backup was created before purging.")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to purge database: {str(e)}")
+            # Back up and delete on a worker thread so a large table doesn't
+            # freeze the window
+            self.purge_button.state(["disabled"])
+            self.run_in_background(self.backup_and_purge, self.show_purge_result)
+
+    def backup_and_purge(self) -> str:
+        """Backs up the database file, then purges; returns the backup's file name.
+
+        Runs on a worker thread, so it uses its own connection. Nothing is
+        deleted if the backup cannot be written.
+        """
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"database_backup_{timestamp}.db"
+        with LabDatabase(self.db.db_name) as db:
+            # A page-level copy: lossless and restorable, unlike the text export
+            db.backup(filename)
+            db.purge()
+        return filename
+
+    def show_purge_result(self, filename, error=None):
+        self.purge_button.state(["!disabled"])
+        if error is not None:
+            messagebox.showerror("Error", f"Failed to purge database: {str(error)}")
+            return
+        self.refresh_view()
+        messagebox.showinfo("Success", "Database has been purged successfully.\n"
+                                       f"A backup was saved to {filename} before purging.")
 
 
 def main():
     root = tk.Tk()
     app = LabParametersGUI(root)
-    root.mainloop()
+    try:
+        root.mainloop()
+    finally:
+        app.db.close()
 
 
 if __name__ == "__main__":